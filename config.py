@@ -1,29 +1,69 @@
 """Configuration management for NHL Stats Tracker."""
 import os
+from urllib.parse import quote_plus
+from dataclasses import dataclass
+from functools import lru_cache
 from dotenv import load_dotenv
 
-load_dotenv()
-
 
+@dataclass(frozen=True)
 class Config:
-    """Application configuration."""
+    """Application configuration, read from the environment once at startup."""
+
+    # Database settings - SQLite by default, PostgreSQL when DB_BACKEND=postgresql
+    DB_BACKEND: str
+    DB_PATH: str
+    DATABASE_URL: str
 
-    # Database settings - SQLite
-    DB_PATH = os.getenv('DB_PATH', 'nhl_stats.db')
+    # Connection pool settings (ignored for SQLite)
+    DB_POOL_SIZE: int
+    DB_MAX_OVERFLOW: int
+    DB_POOL_RECYCLE: int  # Seconds before a pooled connection is replaced
 
-    @property
-    def DATABASE_URL(self):
-        """Construct database URL."""
-        return f"sqlite:///{self.DB_PATH}"
-    
     # Application settings
-    UPDATE_INTERVAL_HOURS = int(os.getenv('UPDATE_INTERVAL_HOURS', '24'))
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-    
+    UPDATE_INTERVAL_HOURS: int
+    FETCH_WORKERS: int  # Concurrent API requests
+    HTTP_CACHE_PATH: str  # SQLite file for cached API responses
+    LOG_LEVEL: str
+
     # NHL API settings
-    NHL_API_BASE_URL = "https://api-web.nhle.com/v1"
-    NHL_STATS_API_BASE_URL = "https://api.nhle.com/stats/rest/en"
-    NHL_LEGACY_API_BASE_URL = "https://statsapi.web.nhl.com/api/v1"  # Legacy API for teams list
+    NHL_API_BASE_URL: str = "https://api-web.nhle.com/v1"
+    NHL_STATS_API_BASE_URL: str = "https://api.nhle.com/stats/rest/en"
+    NHL_LEGACY_API_BASE_URL: str = "https://statsapi.web.nhl.com/api/v1"  # Legacy API for teams list
+
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Load .env and build the configuration; cached for the process lifetime."""
+    load_dotenv()
+
+    db_backend = os.environ.get('DB_BACKEND', 'sqlite').lower()
+    db_path = os.environ.get('DB_PATH', 'nhl_stats.db')
+    if db_backend == 'postgresql':
+        database_url = "postgresql+psycopg://{user}:{password}@{host}:{port}/{name}".format(
+            user=quote_plus(os.environ.get('DB_USER', 'postgres')),
+            password=quote_plus(os.environ.get('DB_PASSWORD', '')),
+            host=os.environ.get('DB_HOST', 'localhost'),
+            port=os.environ.get('DB_PORT', '5432'),
+            name=os.environ.get('DB_NAME', 'nhl_stats')
+        )
+    elif db_backend == 'sqlite':
+        database_url = f"sqlite:///{db_path}"
+    else:
+        raise ValueError(f"Unsupported DB_BACKEND: {db_backend}")
+
+    return Config(
+        DB_BACKEND=db_backend,
+        DB_PATH=db_path,
+        DATABASE_URL=database_url,
+        DB_POOL_SIZE=int(os.environ.get('DB_POOL_SIZE', '20')),
+        DB_MAX_OVERFLOW=int(os.environ.get('DB_MAX_OVERFLOW', '10')),
+        DB_POOL_RECYCLE=int(os.environ.get('DB_POOL_RECYCLE', '1800')),
+        UPDATE_INTERVAL_HOURS=int(os.environ.get('UPDATE_INTERVAL_HOURS', '24')),
+        FETCH_WORKERS=int(os.environ.get('FETCH_WORKERS', '16')),
+        HTTP_CACHE_PATH=os.environ.get('HTTP_CACHE_PATH', '.nhl_cache.sqlite'),
+        LOG_LEVEL=os.environ.get('LOG_LEVEL', 'INFO')
+    )
 
 
-config = Config()
+config = get_config()
@@ -1,15 +1,176 @@
 """Data manager for storing NHL stats in the database."""
 import logging
 from datetime import datetime, date
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+from sqlalchemy import Float, case, cast, column, func, select, table
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
 
+from config import config
 from database import db
 from models import Team, Player, Game, PlayerStats, TeamStats, DataFetchLog
-from nhl_api_client import NHLAPIClient
+from nhl_api_client import NHLAPIClient, pick_default
 
 logger = logging.getLogger(__name__)
 
+# Columns refreshed from the API when a row already exists
+TEAM_UPDATE_COLUMNS = ('name', 'abbreviation', 'city')
+PLAYER_UPDATE_COLUMNS = (
+    'first_name', 'last_name', 'jersey_number', 'position', 'shoots_catches',
+    'height_inches', 'weight_pounds', 'birth_date', 'birth_city',
+    'birth_country', 'team_id'
+)
+
+# PlayerStats columns filled from the club-stats payload, by API field name
+SKATER_STAT_FIELDS = {
+    'games_played': 'gamesPlayed',
+    'goals': 'goals',
+    'assists': 'assists',
+    'points': 'points',
+    'plus_minus': 'plusMinus',
+    'penalty_minutes': 'penaltyMinutes',
+    'power_play_goals': 'powerPlayGoals',
+    'short_handed_goals': 'shorthandedGoals',
+    'game_winning_goals': 'gameWinningGoals',
+    'overtime_goals': 'overtimeGoals',
+    'shots': 'shots',
+    'shooting_percentage': 'shootingPctg',
+    'time_on_ice_per_game': 'avgTimeOnIcePerGame',
+    'faceoff_percentage': 'faceoffWinPctg',
+}
+GOALIE_STAT_FIELDS = {
+    'games_played': 'gamesPlayed',
+    'goals': 'goals',
+    'assists': 'assists',
+    'points': 'points',
+    'penalty_minutes': 'penaltyMinutes',
+    'wins': 'wins',
+    'losses': 'losses',
+    'overtime_losses': 'overtimeLosses',
+    'saves': 'saves',
+    'shots_against': 'shotsAgainst',
+    'goals_against': 'goalsAgainst',
+    'save_percentage': 'savePercentage',
+    'goals_against_average': 'goalsAgainstAverage',
+    'shutouts': 'shutouts',
+}
+# Rate stats stay NULL when missing; counting stats default to 0
+_FLOAT_STAT_COLUMNS = {
+    'shooting_percentage', 'time_on_ice_per_game', 'faceoff_percentage',
+    'save_percentage', 'goals_against_average'
+}
+TEAM_STATS_UPDATE_COLUMNS = (
+    'games_played', 'wins', 'losses', 'overtime_losses', 'points',
+    'point_percentage', 'goals_for', 'goals_against', 'goal_differential'
+)
+PLAYER_STATS_UPDATE_COLUMNS = tuple(dict.fromkeys(
+    list(SKATER_STAT_FIELDS) + list(GOALIE_STAT_FIELDS)
+))
+
+# Player stats are stored per club, so a traded player keeps a row per team
+PLAYER_STATS_KEY = ('player_id', 'season', 'team_id')
+
+# Batches larger than this are loaded with COPY on PostgreSQL
+COPY_THRESHOLD = 100
+
+# INSERT ... ON CONFLICT constructs for the supported backends (see config.py)
+_ON_CONFLICT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def _row_key(row: Dict, keys: Tuple[str, ...]):
+    """Return the unique key of a row: the bare value for one column, else a tuple."""
+    return row[keys[0]] if len(keys) == 1 else tuple(row[k] for k in keys)
+
+
+def _upsert(session, model, rows: List[Dict], keys: Tuple[str, ...],
+            update_columns: Tuple[str, ...], return_ids: bool = False) -> Optional[Dict]:
+    """Insert or update ``rows`` of ``model`` matched on the unique columns ``keys``.
+    
+    With ``return_ids`` the generated primary keys come back from the same
+    statement (INSERT ... RETURNING) as a ``{key: id}`` dict, so callers don't
+    need a follow-up SELECT to reference the rows.
+    """
+    if not rows:
+        return {} if return_ids else None
+    
+    # ON CONFLICT can't touch the same target row twice in one statement
+    unique_rows = {}
+    for row in rows:
+        key = _row_key(row, keys)
+        if key in unique_rows and unique_rows[key] != row:
+            logger.warning(f"Conflicting {model.__tablename__} rows for {key}; keeping the last one")
+        unique_rows[key] = row
+    rows = list(unique_rows.values())
+    
+    dialect_name = db.engine.dialect.name
+    if dialect_name == 'postgresql' and len(rows) > COPY_THRESHOLD:
+        return _copy_upsert(session, model, rows, keys, update_columns, return_ids)
+    
+    # One executemany statement; the unique index resolves insert vs update
+    stmt = _ON_CONFLICT_INSERTS[dialect_name](model.__table__)
+    stmt = _on_conflict_update(stmt, keys, update_columns)
+    if not return_ids:
+        session.execute(stmt, rows)
+        return None
+    stmt = stmt.returning(model.id, *[getattr(model, k) for k in keys])
+    return {_row_key(row._mapping, keys): row.id for row in session.execute(stmt, rows)}
+
+
+def _games_weighted_average(stat_column):
+    """Average a per-game rate across per-club rows, weighted by games played."""
+    games_with_value = func.sum(case((stat_column.isnot(None), PlayerStats.games_played)))
+    return func.sum(stat_column * PlayerStats.games_played) / func.nullif(games_with_value, 0)
+
+
+def _on_conflict_update(stmt, keys: Tuple[str, ...], update_columns: Tuple[str, ...]):
+    """Attach ON CONFLICT (keys) DO UPDATE to a dialect insert statement."""
+    return stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={
+            **{col: stmt.excluded[col] for col in update_columns},
+            # Column.onupdate is not applied to ON CONFLICT updates
+            'updated_at': func.now()
+        }
+    )
+
+
+def _copy_upsert(session, model, rows: List[Dict], keys: Tuple[str, ...],
+                 update_columns: Tuple[str, ...], return_ids: bool) -> Optional[Dict]:
+    """PostgreSQL bulk path: COPY rows into a temp table, then upsert from it.
+    
+    COPY streams all rows in one command instead of parsing and planning an
+    INSERT per row; a single INSERT ... SELECT ... ON CONFLICT then merges them.
+    """
+    columns = list(rows[0])
+    table_name = model.__tablename__
+    temp_name = f"tmp_{table_name}_upsert"
+    column_list = ', '.join(columns)
+    
+    connection = session.connection()
+    connection.exec_driver_sql(
+        f"CREATE TEMP TABLE {temp_name} AS SELECT {column_list} FROM {table_name} WITH NO DATA"
+    )
+    with connection.connection.dbapi_connection.cursor() as cursor:
+        with cursor.copy(f"COPY {temp_name} ({column_list}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row([row[col] for col in columns])
+    
+    temp_table = table(temp_name, *[column(col) for col in columns])
+    stmt = postgresql.insert(model.__table__).from_select(columns, select(*temp_table.c))
+    stmt = _on_conflict_update(stmt, keys, update_columns)
+    ids = None
+    if return_ids:
+        stmt = stmt.returning(model.id, *[getattr(model, k) for k in keys])
+        ids = {_row_key(row._mapping, keys): row.id for row in connection.execute(stmt)}
+    else:
+        connection.execute(stmt)
+    connection.exec_driver_sql(f"DROP TABLE {temp_name}")
+    return ids
+
 
 class DataManager:
     """Manages data fetching and storage operations."""
@@ -18,18 +179,31 @@ class DataManager:
         """Initialize data manager."""
         self.api_client = NHLAPIClient()
     
-    def _log_fetch(self, fetch_type: str, status: str, records: int = 0, 
+    def _log_fetch(self, session, fetch_type: str, status: str, records: int = 0,
                    error: Optional[str] = None, duration: Optional[float] = None):
-        """Log data fetch operation."""
-        with db.get_session() as session:
-            log = DataFetchLog(
-                fetch_type=fetch_type,
-                status=status,
-                records_fetched=records,
-                error_message=error,
-                duration_seconds=duration
-            )
+        """Log data fetch operation.
+        
+        The log row joins the caller's session so it commits with the data it
+        describes. Pass None on error paths where that session was rolled back.
+        """
+        log = DataFetchLog(**self._fetch_log_row(fetch_type, status, records, error, duration))
+        if session is not None:
             session.add(log)
+            return
+        
+        with db.get_session() as log_session:
+            log_session.add(log)
+    
+    def _fetch_log_row(self, fetch_type: str, status: str, records: int = 0,
+                       error: Optional[str] = None, duration: Optional[float] = None) -> Dict:
+        """Build a data_fetch_logs row."""
+        return {
+            'fetch_type': fetch_type,
+            'status': status,
+            'records_fetched': records,
+            'error_message': error,
+            'duration_seconds': duration
+        }
     
     def fetch_and_store_teams(self) -> bool:
         """Fetch all teams and store in database."""
@@ -39,55 +213,39 @@ class DataManager:
         try:
             teams_data = self.api_client.get_teams()
             if not teams_data:
-                self._log_fetch('teams', 'error', error='No data returned from API')
+                self._log_fetch(None, 'teams', 'error', error='No data returned from API')
                 return False
             
-            with db.get_session() as session:
-                count = 0
-                for team_data in teams_data:
-                    # Check if team exists
-                    team = session.query(Team).filter_by(nhl_id=team_data.get('id')).first()
-
-                    # Extract data with fallbacks for both legacy and new API formats
-                    team_name = team_data.get('name') or team_data.get('fullName', '')
-                    team_abbr = team_data.get('abbreviation') or team_data.get('triCode', '')
-
-                    # Handle venue data (legacy API format)
-                    venue = team_data.get('venue', {})
-                    team_city = venue.get('city', '') if venue else ''
-
-                    if team:
-                        # Update existing team
-                        team.name = team_name
-                        team.abbreviation = team_abbr
-                        team.city = team_city
-                        team.updated_at = datetime.utcnow()
-                    else:
-                        # Create new team
-                        team = Team(
-                            nhl_id=team_data.get('id'),
-                            name=team_name,
-                            abbreviation=team_abbr,
-                            city=team_city,
-                            active=team_data.get('active', True)
-                        )
-                        session.add(team)
+            rows = []
+            for team_data in teams_data:
+                # Extract data with fallbacks for both legacy and new API formats
+                venue = team_data.get('venue', {})
+                rows.append({
+                    'nhl_id': team_data.get('id'),
+                    'name': team_data.get('name') or team_data.get('fullName', ''),
+                    'abbreviation': team_data.get('abbreviation') or team_data.get('triCode', ''),
+                    'city': venue.get('city', '') if venue else '',
+                    'active': team_data.get('active', True)
+                })
 
-                    count += 1
+            with db.get_session() as session:
+                # Single upsert keyed on nhl_id instead of a SELECT per team
+                _upsert(session, Team, rows, ('nhl_id',), TEAM_UPDATE_COLUMNS)
+                count = len(rows)
                 
                 duration = (datetime.now() - start_time).total_seconds()
-                self._log_fetch('teams', 'success', count, duration=duration)
+                self._log_fetch(session, 'teams', 'success', count, duration=duration)
                 logger.info(f"Successfully stored {count} teams in {duration:.2f}s")
                 return True
                 
         except Exception as e:
             duration = (datetime.now() - start_time).total_seconds()
             error_msg = str(e)
-            self._log_fetch('teams', 'error', error=error_msg, duration=duration)
+            self._log_fetch(None, 'teams', 'error', error=error_msg, duration=duration)
             logger.error(f"Failed to fetch and store teams: {e}")
             return False
     
-    def fetch_and_store_team_roster(self, team_abbr: str, season: Optional[str] = None) -> bool:
+    def fetch_and_store_team_roster(self, team_abbr: str, season: Optional[int] = None) -> bool:
         """Fetch team roster and store players."""
         start_time = datetime.now()
         logger.info(f"Starting roster fetch for {team_abbr}...")
@@ -95,7 +253,7 @@ class DataManager:
         try:
             roster_data = self.api_client.get_team_roster(team_abbr, season)
             if not roster_data:
-                self._log_fetch('players', 'error', error=f'No roster data for {team_abbr}')
+                self._log_fetch(None, 'players', 'error', error=f'No roster data for {team_abbr}')
                 return False
             
             with db.get_session() as session:
@@ -105,96 +263,75 @@ class DataManager:
                     logger.error(f"Team {team_abbr} not found in database")
                     return False
                 
-                count = 0
-                
-                # Process forwards
-                for player_data in roster_data.get('forwards', []):
-                    self._store_player(session, player_data, team.id)
-                    count += 1
-                
-                # Process defensemen
-                for player_data in roster_data.get('defensemen', []):
-                    self._store_player(session, player_data, team.id)
-                    count += 1
-                
-                # Process goalies
-                for player_data in roster_data.get('goalies', []):
-                    self._store_player(session, player_data, team.id)
-                    count += 1
+                count = len(self._store_roster(session, team.id, roster_data))
                 
                 duration = (datetime.now() - start_time).total_seconds()
-                self._log_fetch('players', 'success', count, duration=duration)
+                self._log_fetch(session, 'players', 'success', count, duration=duration)
                 logger.info(f"Successfully stored {count} players for {team_abbr} in {duration:.2f}s")
                 return True
                 
         except Exception as e:
             duration = (datetime.now() - start_time).total_seconds()
             error_msg = str(e)
-            self._log_fetch('players', 'error', error=error_msg, duration=duration)
+            self._log_fetch(None, 'players', 'error', error=error_msg, duration=duration)
             logger.error(f"Failed to fetch and store roster for {team_abbr}: {e}")
             return False
     
-    def _store_player(self, session, player_data: Dict, team_id: int):
-        """Store or update a single player."""
-        player_id = player_data.get('id')
-        if not player_id:
-            return
-        
-        player = session.query(Player).filter_by(nhl_id=player_id).first()
+    def _store_roster(self, session, team_id: int, roster_data: Dict) -> Dict[int, int]:
+        """Upsert every player on a roster payload, returning ``{nhl_id: player id}``."""
+        rows = self._parse_roster(team_id, roster_data)
         
+        # Single batched upsert for the whole roster; RETURNING hands back the
+        # ids so player stats can reference them without another SELECT
+        return _upsert(session, Player, rows, ('nhl_id',), PLAYER_UPDATE_COLUMNS,
+                       return_ids=True)
+    
+    def _parse_roster(self, team_id: int, roster_data: Dict) -> List[Dict]:
+        """Flatten forwards, defensemen and goalies into players table rows."""
+        players = (roster_data.get('forwards', []) +
+                   roster_data.get('defensemen', []) +
+                   roster_data.get('goalies', []))
+        return [self._parse_player(player_data, team_id)
+                for player_data in players if player_data.get('id')]
+    
+    def _parse_player(self, player_data: Dict, team_id: int) -> Dict:
+        """Flatten a roster entry from the API into a players table row."""
         # Parse birth date
         birth_date = None
         if player_data.get('birthDate'):
             try:
-                birth_date = datetime.strptime(player_data['birthDate'], '%Y-%m-%d').date()
-            except:
+                birth_date = date.fromisoformat(player_data['birthDate'])
+            except ValueError:
                 pass
         
-        if player:
-            # Update existing player
-            player.first_name = player_data.get('firstName', {}).get('default', '')
-            player.last_name = player_data.get('lastName', {}).get('default', '')
-            player.jersey_number = player_data.get('sweaterNumber')
-            player.position = player_data.get('positionCode')
-            player.shoots_catches = player_data.get('shootsCatches')
-            player.height_inches = player_data.get('heightInInches')
-            player.weight_pounds = player_data.get('weightInPounds')
-            player.birth_date = birth_date
-            player.birth_city = player_data.get('birthCity', {}).get('default', '')
-            player.birth_country = player_data.get('birthCountry')
-            player.team_id = team_id
-            player.updated_at = datetime.utcnow()
-        else:
-            # Create new player
-            player = Player(
-                nhl_id=player_id,
-                first_name=player_data.get('firstName', {}).get('default', ''),
-                last_name=player_data.get('lastName', {}).get('default', ''),
-                jersey_number=player_data.get('sweaterNumber'),
-                position=player_data.get('positionCode'),
-                shoots_catches=player_data.get('shootsCatches'),
-                height_inches=player_data.get('heightInInches'),
-                weight_pounds=player_data.get('weightInPounds'),
-                birth_date=birth_date,
-                birth_city=player_data.get('birthCity', {}).get('default', ''),
-                birth_country=player_data.get('birthCountry'),
-                team_id=team_id,
-                active=True
-            )
-            session.add(player)
+        # Missing localized fields are stored as '' (names are NOT NULL columns)
+        return {
+            'nhl_id': player_data['id'],
+            'first_name': pick_default(player_data.get('firstName')) or '',
+            'last_name': pick_default(player_data.get('lastName')) or '',
+            'jersey_number': player_data.get('sweaterNumber'),
+            'position': player_data.get('positionCode'),
+            'shoots_catches': player_data.get('shootsCatches'),
+            'height_inches': player_data.get('heightInInches'),
+            'weight_pounds': player_data.get('weightInPounds'),
+            'birth_date': birth_date,
+            'birth_city': pick_default(player_data.get('birthCity')) or '',
+            'birth_country': player_data.get('birthCountry'),
+            'team_id': team_id,
+            'active': True
+        }
     
-    def fetch_and_store_team_stats(self, team_abbr: str, season: Optional[str] = None) -> bool:
+    def fetch_and_store_team_stats(self, team_abbr: str, season: Optional[int] = None) -> bool:
         """Fetch and store team statistics."""
         start_time = datetime.now()
-        if not season:
-            season = self.api_client.get_current_season()
-        
-        logger.info(f"Starting team stats fetch for {team_abbr} - {season}...")
         
         try:
+            season = season or self.api_client.get_current_season()
+            logger.info(f"Starting team stats fetch for {team_abbr} - {season}...")
+            
             stats_data = self.api_client.get_team_stats(team_abbr, season)
             if not stats_data:
-                self._log_fetch('team_stats', 'error', error=f'No stats for {team_abbr}')
+                self._log_fetch(None, 'team_stats', 'error', error=f'No stats for {team_abbr}')
                 return False
             
             with db.get_session() as session:
@@ -203,56 +340,218 @@ class DataManager:
                     logger.error(f"Team {team_abbr} not found in database")
                     return False
                 
-                # Check if stats record exists
-                team_stats = session.query(TeamStats).filter_by(
-                    team_id=team.id, season=season
-                ).first()
-                
-                # Extract stats from API response
-                standings = stats_data.get('standings', {})
+                self._store_team_stats(session, team.id, season, stats_data)
                 
-                if team_stats:
-                    # Update existing stats
-                    team_stats.games_played = standings.get('gamesPlayed', 0)
-                    team_stats.wins = standings.get('wins', 0)
-                    team_stats.losses = standings.get('losses', 0)
-                    team_stats.overtime_losses = standings.get('otLosses', 0)
-                    team_stats.points = standings.get('points', 0)
-                    team_stats.point_percentage = standings.get('pointPctg', 0.0)
-                    team_stats.goals_for = standings.get('goalFor', 0)
-                    team_stats.goals_against = standings.get('goalAgainst', 0)
-                    team_stats.goal_differential = standings.get('goalDifferential', 0)
-                    team_stats.updated_at = datetime.utcnow()
-                else:
-                    # Create new stats record
-                    team_stats = TeamStats(
-                        team_id=team.id,
-                        season=season,
-                        games_played=standings.get('gamesPlayed', 0),
-                        wins=standings.get('wins', 0),
-                        losses=standings.get('losses', 0),
-                        overtime_losses=standings.get('otLosses', 0),
-                        points=standings.get('points', 0),
-                        point_percentage=standings.get('pointPctg', 0.0),
-                        goals_for=standings.get('goalFor', 0),
-                        goals_against=standings.get('goalAgainst', 0),
-                        goal_differential=standings.get('goalDifferential', 0)
-                    )
-                    session.add(team_stats)
+                # Player stats reference players by id; map the payload's NHL ids
+                # in one query
+                player_ids = self._lookup_player_ids(session, self._stats_nhl_ids(stats_data))
+                self._store_player_stats(session, team.id, season, stats_data, player_ids)
                 
                 duration = (datetime.now() - start_time).total_seconds()
-                self._log_fetch('team_stats', 'success', 1, duration=duration)
+                self._log_fetch(session, 'team_stats', 'success', 1, duration=duration)
                 logger.info(f"Successfully stored team stats for {team_abbr} in {duration:.2f}s")
                 return True
                 
         except Exception as e:
             duration = (datetime.now() - start_time).total_seconds()
             error_msg = str(e)
-            self._log_fetch('team_stats', 'error', error=error_msg, duration=duration)
+            self._log_fetch(None, 'team_stats', 'error', error=error_msg, duration=duration)
             logger.error(f"Failed to fetch and store team stats for {team_abbr}: {e}")
             return False
     
-    def fetch_all_teams_data(self, season: Optional[str] = None) -> bool:
+    def _store_team_stats(self, session, team_id: int, season: int, stats_data: Dict):
+        """Create or update the team stats record for a season."""
+        _upsert(session, TeamStats, [self._parse_team_stats(team_id, season, stats_data)],
+                ('team_id', 'season'), TEAM_STATS_UPDATE_COLUMNS)
+    
+    def _parse_team_stats(self, team_id: int, season: int, stats_data: Dict) -> Dict:
+        """Flatten a team stats payload into a team_stats table row."""
+        standings = stats_data.get('standings', {})
+        return {
+            'team_id': team_id,
+            'season': season,
+            'games_played': standings.get('gamesPlayed', 0),
+            'wins': standings.get('wins', 0),
+            'losses': standings.get('losses', 0),
+            'overtime_losses': standings.get('otLosses', 0),
+            'points': standings.get('points', 0),
+            'point_percentage': standings.get('pointPctg', 0.0),
+            'goals_for': standings.get('goalFor', 0),
+            'goals_against': standings.get('goalAgainst', 0),
+            'goal_differential': standings.get('goalDifferential', 0)
+        }
+    
+    def _stats_nhl_ids(self, stats_data: Dict) -> List[int]:
+        """NHL player ids of every skater and goalie in a club-stats payload."""
+        return [
+            player['playerId'] for player in
+            stats_data.get('skaters', []) + stats_data.get('goalies', [])
+            if player.get('playerId')
+        ]
+    
+    def _lookup_player_ids(self, session, nhl_ids: List[int]) -> Dict[int, int]:
+        """Map NHL player ids already stored in the players table to their ids."""
+        if not nhl_ids:
+            return {}
+        return dict(
+            session.query(Player.nhl_id, Player.id)
+            .filter(Player.nhl_id.in_(set(nhl_ids))).all()
+        )
+    
+    def _parse_player_stats(self, team_id: int, season: int, stats_data: Dict,
+                            player_ids: Dict[int, int]) -> List[Dict]:
+        """Flatten club-stats skaters and goalies into player_stats table rows.
+        
+        Players missing from ``player_ids`` (not stored yet) are skipped.
+        """
+        rows = []
+        for entries, fields in ((stats_data.get('skaters', []), SKATER_STAT_FIELDS),
+                                (stats_data.get('goalies', []), GOALIE_STAT_FIELDS)):
+            for entry in entries:
+                player_id = player_ids.get(entry.get('playerId'))
+                if player_id is None:
+                    continue
+                # Every row carries every column so the batch stays one executemany
+                row = {
+                    col: None if col in _FLOAT_STAT_COLUMNS else 0
+                    for col in PLAYER_STATS_UPDATE_COLUMNS
+                }
+                row.update({
+                    col: entry[field] for col, field in fields.items()
+                    if entry.get(field) is not None
+                })
+                row.update({'player_id': player_id, 'season': season, 'team_id': team_id})
+                rows.append(row)
+        return rows
+    
+    def _store_player_stats(self, session, team_id: int, season: int, stats_data: Dict,
+                            player_ids: Dict[int, int]) -> int:
+        """Upsert a team's player stats for a season, returning the row count."""
+        rows = self._parse_player_stats(team_id, season, stats_data, player_ids)
+        _upsert(session, PlayerStats, rows, PLAYER_STATS_KEY, PLAYER_STATS_UPDATE_COLUMNS)
+        return len(rows)
+    
+    def _timed_fetch(self, fetch, team_abbr: str, season: int) -> Tuple[Optional[Dict], float]:
+        """Call an API fetch method without touching the database, returning its payload and duration.
+        
+        Failures are logged and returned as no data, so one team's error doesn't
+        abort the other teams in the batch.
+        """
+        start_time = datetime.now()
+        try:
+            data = fetch(team_abbr, season)
+        except Exception as e:
+            logger.error(f"Failed to fetch {fetch.__name__} for {team_abbr}: {e}")
+            data = None
+        return data, (datetime.now() - start_time).total_seconds()
+    
+    def fetch_and_store_teams_data(self, team_abbrs: List[str],
+                                   season: Optional[int] = None) -> Dict[str, Dict[str, bool]]:
+        """Fetch rosters and stats for several teams concurrently and store them.
+        
+        Returns per-team success flags, e.g. ``{'TOR': {'roster': True, 'stats': True}}``.
+        """
+        season = season or self.api_client.get_current_season()
+        results = {team_abbr: {'roster': False, 'stats': False} for team_abbr in team_abbrs}
+        
+        with db.get_session() as session:
+            team_ids = dict(
+                session.query(Team.abbreviation, Team.id)
+                .filter(Team.abbreviation.in_(team_abbrs)).all()
+            )
+        for team_abbr in team_abbrs:
+            if team_abbr not in team_ids:
+                logger.error(f"Team {team_abbr} not found in database")
+        
+        # Fetch every roster and stats payload concurrently; the requests are
+        # I/O bound so the network waits overlap across worker threads
+        logger.info(f"Fetching rosters and stats for {len(team_ids)} teams "
+                    f"with {config.FETCH_WORKERS} workers...")
+        with ThreadPoolExecutor(max_workers=config.FETCH_WORKERS) as executor:
+            roster_futures = {
+                team_abbr: executor.submit(self._timed_fetch, self.api_client.get_team_roster,
+                                           team_abbr, season)
+                for team_abbr in team_ids
+            }
+            stats_futures = {
+                team_abbr: executor.submit(self._timed_fetch, self.api_client.get_team_stats,
+                                           team_abbr, season)
+                for team_abbr in team_ids
+            }
+            rosters = {team_abbr: future.result() for team_abbr, future in roster_futures.items()}
+            stats = {team_abbr: future.result() for team_abbr, future in stats_futures.items()}
+        
+        # Persist everything in a single transaction
+        try:
+            with db.get_session() as session:
+                # Every roster is written with one upsert before the stats, which
+                # also lets large batches take the COPY path on PostgreSQL
+                player_rows = []
+                # Log rows are collected and inserted in one batch at the end,
+                # bypassing the unit of work like the data they describe
+                log_rows = []
+                
+                for team_abbr, team_id in team_ids.items():
+                    roster_data, roster_duration = rosters[team_abbr]
+                    if roster_data:
+                        team_rows = self._parse_roster(team_id, roster_data)
+                        player_rows.extend(team_rows)
+                        log_rows.append(self._fetch_log_row('players', 'success', len(team_rows),
+                                                            duration=roster_duration))
+                        results[team_abbr]['roster'] = True
+                    else:
+                        log_rows.append(self._fetch_log_row('players', 'error', error=f'No roster data for {team_abbr}',
+                                                            duration=roster_duration))
+                
+                # RETURNING gives nhl_id -> id for the player stats rows below
+                player_ids = _upsert(session, Player, player_rows, ('nhl_id',),
+                                     PLAYER_UPDATE_COLUMNS, return_ids=True)
+                # Stats can list stored players missing from this run's rosters
+                # (e.g. traded away); look those up like the single-team path
+                missing_ids = [
+                    nhl_id for stats_data, _ in stats.values() if stats_data
+                    for nhl_id in self._stats_nhl_ids(stats_data) if nhl_id not in player_ids
+                ]
+                player_ids.update(self._lookup_player_ids(session, missing_ids))
+                
+                team_stats_rows = []
+                player_stats_rows = []
+                for team_abbr, team_id in team_ids.items():
+                    stats_data, stats_duration = stats[team_abbr]
+                    if stats_data:
+                        team_stats_rows.append(self._parse_team_stats(team_id, season, stats_data))
+                        player_stats_rows.extend(
+                            self._parse_player_stats(team_id, season, stats_data, player_ids)
+                        )
+                        log_rows.append(self._fetch_log_row('team_stats', 'success', 1,
+                                                            duration=stats_duration))
+                        results[team_abbr]['stats'] = True
+                    else:
+                        log_rows.append(self._fetch_log_row('team_stats', 'error', error=f'No stats for {team_abbr}',
+                                                            duration=stats_duration))
+                
+                _upsert(session, TeamStats, team_stats_rows, ('team_id', 'season'),
+                        TEAM_STATS_UPDATE_COLUMNS)
+                _upsert(session, PlayerStats, player_stats_rows, PLAYER_STATS_KEY,
+                        PLAYER_STATS_UPDATE_COLUMNS)
+                session.bulk_insert_mappings(DataFetchLog, log_rows)
+        except Exception as e:
+            logger.error(f"Failed to store team data: {e}")
+            # The batch session rolled back with its log rows; record the
+            # failure for every team in a fresh session instead
+            error_msg = str(e)
+            with db.get_session() as log_session:
+                log_session.bulk_insert_mappings(DataFetchLog, [
+                    self._fetch_log_row(fetch_type, 'error', error=error_msg, duration=duration)
+                    for team_abbr in team_ids
+                    for fetch_type, (_, duration) in (('players', rosters[team_abbr]),
+                                                      ('team_stats', stats[team_abbr]))
+                ])
+            return {team_abbr: {'roster': False, 'stats': False} for team_abbr in team_abbrs}
+        
+        return results
+    
+    def fetch_all_teams_data(self, season: Optional[int] = None) -> bool:
         """Fetch teams, rosters, and stats for all teams."""
         logger.info("Starting full data fetch for all teams...")
         
@@ -263,23 +562,70 @@ class DataManager:
         
         # Get all teams from database
         with db.get_session() as session:
-            teams = session.query(Team).filter_by(active=True).all()
-            team_abbrs = [team.abbreviation for team in teams]
+            team_abbrs = [
+                abbreviation for (abbreviation,) in
+                session.query(Team.abbreviation).filter_by(active=True).all()
+            ]
         
-        # Fetch roster and stats for each team
-        success_count = 0
-        for team_abbr in team_abbrs:
-            logger.info(f"Processing {team_abbr}...")
-            
-            if self.fetch_and_store_team_roster(team_abbr, season):
-                success_count += 1
-            
-            if self.fetch_and_store_team_stats(team_abbr, season):
-                success_count += 1
+        results = self.fetch_and_store_teams_data(team_abbrs, season)
+        success_count = sum(
+            team_result['roster'] + team_result['stats'] for team_result in results.values()
+        )
+        if not success_count:
+            logger.error("Failed to store rosters and stats for any team")
+            return False
         
         logger.info(f"Completed data fetch. Successful operations: {success_count}")
         return True
     
+    def get_top_skaters(self, season: Optional[int] = None, stat: str = 'points',
+                        limit: int = 100) -> List[Dict]:
+        """Rank skaters by a season stat from the local database.
+        
+        Served from PlayerStats instead of the NHL stats API, so dashboards don't
+        pay a network round-trip per call. Per-club rows are summed into season
+        totals, so traded players rank on their full season under their
+        current team.
+        """
+        if stat not in SKATER_STAT_FIELDS:
+            raise ValueError(f"Unknown skater stat: {stat}")
+        season = season or self.api_client.get_current_season()
+        
+        games_played = func.sum(PlayerStats.games_played)
+        if stat == 'shooting_percentage':
+            value = cast(func.sum(PlayerStats.goals), Float) / func.nullif(func.sum(PlayerStats.shots), 0)
+        elif stat == 'time_on_ice_per_game':
+            value = _games_weighted_average(PlayerStats.time_on_ice_per_game)
+        elif stat == 'faceoff_percentage':
+            # Per-club faceoff counts aren't stored, so this weights by games played
+            value = _games_weighted_average(PlayerStats.faceoff_percentage)
+        else:
+            value = func.sum(getattr(PlayerStats, stat))
+        
+        totals = (
+            select(PlayerStats.player_id,
+                   games_played.label('games_played'),
+                   func.sum(PlayerStats.goals).label('goals'),
+                   func.sum(PlayerStats.assists).label('assists'),
+                   func.sum(PlayerStats.points).label('points'),
+                   value.label('value'))
+            .where(PlayerStats.season == season)
+            .group_by(PlayerStats.player_id)
+            .subquery()
+        )
+        query = (
+            select(Player.first_name, Player.last_name, Team.abbreviation.label('team'),
+                   totals.c.games_played, totals.c.goals, totals.c.assists,
+                   totals.c.points, totals.c.value)
+            .join(totals, totals.c.player_id == Player.id)
+            .outerjoin(Team, Team.id == Player.team_id)
+            .where(Player.position != 'G')
+            .order_by(totals.c.value.desc().nulls_last(), Player.id)
+            .limit(limit)
+        )
+        with db.get_session() as session:
+            return [dict(row._mapping) for row in session.execute(query)]
+    
     def close(self):
         """Close API client."""
         self.api_client.close()
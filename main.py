@@ -4,7 +4,7 @@ import logging
 import sys
 
 from database import db
-from data_manager import DataManager
+from data_manager import DataManager, SKATER_STAT_FIELDS
 from config import config
 
 # Setup logging
@@ -19,6 +19,18 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Shared across commands so the API client's HTTP session (and its
+# keep-alive connections) is reused; created on first use
+_data_manager = None
+
+
+def get_data_manager() -> DataManager:
+    """Return the process-wide DataManager, creating it if needed."""
+    global _data_manager
+    if _data_manager is None:
+        _data_manager = DataManager()
+    return _data_manager
+
 
 def init_database():
     """Initialize database and create tables."""
@@ -31,71 +43,84 @@ def init_database():
 def fetch_teams():
     """Fetch and store all NHL teams."""
     logger.info("Fetching NHL teams...")
-    data_manager = DataManager()
-    try:
-        success = data_manager.fetch_and_store_teams()
-        if success:
-            logger.info("Teams fetched successfully")
-        else:
-            logger.error("Failed to fetch teams")
-        return success
-    finally:
-        data_manager.close()
+    data_manager = get_data_manager()
+    success = data_manager.fetch_and_store_teams()
+    if success:
+        logger.info("Teams fetched successfully")
+    else:
+        logger.error("Failed to fetch teams")
+    return success
 
 
-def fetch_roster(team_abbr: str, season: str = None):
+def fetch_roster(team_abbr: str, season: int = None):
     """Fetch and store team roster."""
     logger.info(f"Fetching roster for {team_abbr}...")
-    data_manager = DataManager()
-    try:
-        success = data_manager.fetch_and_store_team_roster(team_abbr, season)
-        if success:
-            logger.info(f"Roster for {team_abbr} fetched successfully")
-        else:
-            logger.error(f"Failed to fetch roster for {team_abbr}")
-        return success
-    finally:
-        data_manager.close()
+    data_manager = get_data_manager()
+    success = data_manager.fetch_and_store_team_roster(team_abbr, season)
+    if success:
+        logger.info(f"Roster for {team_abbr} fetched successfully")
+    else:
+        logger.error(f"Failed to fetch roster for {team_abbr}")
+    return success
 
 
-def fetch_team_stats(team_abbr: str, season: str = None):
+def fetch_team_stats(team_abbr: str, season: int = None):
     """Fetch and store team statistics."""
     logger.info(f"Fetching stats for {team_abbr}...")
-    data_manager = DataManager()
-    try:
-        success = data_manager.fetch_and_store_team_stats(team_abbr, season)
-        if success:
-            logger.info(f"Stats for {team_abbr} fetched successfully")
-        else:
-            logger.error(f"Failed to fetch stats for {team_abbr}")
-        return success
-    finally:
-        data_manager.close()
+    data_manager = get_data_manager()
+    success = data_manager.fetch_and_store_team_stats(team_abbr, season)
+    if success:
+        logger.info(f"Stats for {team_abbr} fetched successfully")
+    else:
+        logger.error(f"Failed to fetch stats for {team_abbr}")
+    return success
 
 
-def fetch_all():
+def fetch_all(season: int = None, force_refresh: bool = False):
     """Fetch all data (teams, rosters, stats)."""
     logger.info("Fetching all NHL data...")
-    data_manager = DataManager()
-    try:
-        success = data_manager.fetch_all_teams_data()
-        if success:
-            logger.info("All data fetched successfully")
-        else:
-            logger.error("Failed to fetch all data")
-        return success
-    finally:
-        data_manager.close()
+    data_manager = get_data_manager()
+    if force_refresh:
+        data_manager.api_client.clear_cache()
+    success = data_manager.fetch_all_teams_data(season)
+    if success:
+        logger.info("All data fetched successfully")
+    else:
+        logger.error("Failed to fetch all data")
+    return success
+
+
+def show_leaders(season: int = None, stat: str = 'points', limit: int = 20):
+    """Display the top skaters for a season from the local database."""
+    data_manager = get_data_manager()
+    leaders = data_manager.get_top_skaters(season, stat, limit)
+    
+    print("\n" + "=" * 50)
+    print(f"TOP {limit} SKATERS BY {stat.upper().replace('_', ' ')}")
+    print("=" * 50)
+    if not leaders:
+        print("No player stats stored for this season. Run 'fetch-all' first.")
+    for rank, leader in enumerate(leaders, 1):
+        name = f"{leader['first_name']} {leader['last_name']}"
+        print(f"{rank:3}. {name:25} {leader['team'] or '':4} | GP: {leader['games_played']:3} | "
+              f"{leader['goals']:3}G {leader['assists']:3}A {leader['points']:3}P | {stat}: {leader['value']}")
+    print("=" * 50 + "\n")
 
 
 def show_stats():
     """Display database statistics."""
+    from sqlalchemy import func, select
     from models import Team, Player, TeamStats, DataFetchLog
     
     with db.get_session() as session:
-        team_count = session.query(Team).count()
-        player_count = session.query(Player).count()
-        stats_count = session.query(TeamStats).count()
+        # All three counts in one round-trip
+        team_count, player_count, stats_count = session.execute(
+            select(
+                select(func.count()).select_from(Team).scalar_subquery(),
+                select(func.count()).select_from(Player).scalar_subquery(),
+                select(func.count()).select_from(TeamStats).scalar_subquery()
+            )
+        ).one()
         
         print("\n" + "=" * 50)
         print("NHL STATS TRACKER - DATABASE STATISTICS")
@@ -137,22 +162,33 @@ def main():
     # Fetch roster command
     roster_parser = subparsers.add_parser('fetch-roster', help='Fetch team roster')
     roster_parser.add_argument('team', help='Team abbreviation (e.g., TOR, MTL)')
-    roster_parser.add_argument('--season', help='Season (e.g., 20232024)', default=None)
+    roster_parser.add_argument('--season', help='Season (e.g., 20232024)', type=int, default=None)
     
     # Fetch team stats command
     stats_parser = subparsers.add_parser('fetch-stats', help='Fetch team statistics')
     stats_parser.add_argument('team', help='Team abbreviation (e.g., TOR, MTL)')
-    stats_parser.add_argument('--season', help='Season (e.g., 20232024)', default=None)
+    stats_parser.add_argument('--season', help='Season (e.g., 20232024)', type=int, default=None)
     
     # Fetch all command
     fetch_all_parser = subparsers.add_parser('fetch-all', help='Fetch all data (teams, rosters, stats)')
-    fetch_all_parser.add_argument('--season', help='Season (e.g., 20232024)', default=None)
+    fetch_all_parser.add_argument('--season', help='Season (e.g., 20232024)', type=int, default=None)
+    fetch_all_parser.add_argument('--force-refresh', action='store_true',
+                                  help='Ignore cached API responses')
     
     # Show stats command
     subparsers.add_parser('stats', help='Show database statistics')
     
+    # Leaders command
+    leaders_parser = subparsers.add_parser('leaders', help='Show top skaters from stored stats')
+    leaders_parser.add_argument('--season', help='Season (e.g., 20232024)', type=int, default=None)
+    leaders_parser.add_argument('--stat', help='Stat to rank by (e.g., points, goals)', default='points',
+                                choices=list(SKATER_STAT_FIELDS))
+    leaders_parser.add_argument('--limit', help='Number of players to show', type=int, default=20)
+    
     # Schedule command
-    subparsers.add_parser('schedule', help='Run scheduled updates')
+    schedule_parser = subparsers.add_parser('schedule', help='Run scheduled updates')
+    schedule_parser.add_argument('--force-refresh', action='store_true',
+                                 help='Ignore cached API responses on the initial update')
     
     args = parser.parse_args()
     
@@ -177,14 +213,17 @@ def main():
             fetch_team_stats(args.team, args.season)
         
         elif args.command == 'fetch-all':
-            fetch_all()
+            fetch_all(args.season, args.force_refresh)
         
         elif args.command == 'stats':
             show_stats()
         
+        elif args.command == 'leaders':
+            show_leaders(args.season, args.stat, args.limit)
+        
         elif args.command == 'schedule':
             from scheduler import main as scheduler_main
-            scheduler_main()
+            scheduler_main(args.force_refresh)
     
     except KeyboardInterrupt:
         logger.info("Operation cancelled by user")
@@ -193,6 +232,8 @@ def main():
         logger.error(f"Error: {e}", exc_info=True)
         sys.exit(1)
     finally:
+        if _data_manager is not None:
+            _data_manager.close()
         db.close()
 
 
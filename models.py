@@ -5,10 +5,18 @@ from sqlalchemy import (
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy.sql import func
 
 Base = declarative_base()
 
+# Relationships default to lazy='raise' so an unplanned attribute access fails
+# loudly instead of issuing one SELECT per parent row (N+1). Load related rows
+# explicitly, e.g. session.query(Team).options(selectinload(Team.players)).
+#
+# Timestamps are stamped by the database (func.now()) rather than per row in
+# Python. The server default covers COPY loads; the SQL-expression default
+# keeps inserts working on tables created before the server default existed.
+
 
 class Team(Base):
     """NHL Team model."""
@@ -17,19 +25,19 @@ class Team(Base):
     id = Column(Integer, primary_key=True)
     nhl_id = Column(Integer, unique=True, nullable=False, index=True)
     name = Column(String(100), nullable=False)
-    abbreviation = Column(String(10), nullable=False)
+    abbreviation = Column(String(10), nullable=False, index=True)
     city = Column(String(100))
     conference = Column(String(50))
     division = Column(String(50))
     active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(DateTime, default=func.now(), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    players = relationship("Player", back_populates="team")
-    team_stats = relationship("TeamStats", back_populates="team")
-    games_home = relationship("Game", foreign_keys="Game.home_team_id", back_populates="home_team")
-    games_away = relationship("Game", foreign_keys="Game.away_team_id", back_populates="away_team")
+    players = relationship("Player", back_populates="team", lazy='raise')
+    team_stats = relationship("TeamStats", back_populates="team", lazy='raise')
+    # No games collections: a team's full game history is never needed as an
+    # attribute, so query Game by home_team_id / away_team_id instead
 
 
 class Player(Base):
@@ -51,15 +59,19 @@ class Player(Base):
     nationality = Column(String(10))
     team_id = Column(Integer, ForeignKey('teams.id'))
     active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(DateTime, default=func.now(), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    team = relationship("Team", back_populates="players")
-    player_stats = relationship("PlayerStats", back_populates="player")
+    team = relationship("Team", back_populates="players", lazy='raise')
+    player_stats = relationship("PlayerStats", back_populates="player", lazy='raise')
     
     __table_args__ = (
         Index('idx_player_name', 'last_name', 'first_name'),
+        # Partial index: only active players. Written as active = true to match
+        # filter_by(active=True), the form SQLite needs to pick the index
+        Index('idx_player_active_team', 'team_id',
+              postgresql_where=active == True, sqlite_where=active == True),
     )
 
 
@@ -69,7 +81,7 @@ class Game(Base):
     
     id = Column(Integer, primary_key=True)
     nhl_id = Column(Integer, unique=True, nullable=False, index=True)
-    season = Column(String(10), nullable=False)  # e.g., "20232024"
+    season = Column(Integer, nullable=False)  # NHL season id, e.g. 20232024
     game_type = Column(String(10))  # Regular, Playoff, etc.
     game_date = Column(DateTime, nullable=False, index=True)
     home_team_id = Column(Integer, ForeignKey('teams.id'), nullable=False)
@@ -78,26 +90,30 @@ class Game(Base):
     away_score = Column(Integer)
     game_state = Column(String(20))  # FINAL, LIVE, SCHEDULED, etc.
     venue = Column(String(100))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(DateTime, default=func.now(), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    home_team = relationship("Team", foreign_keys=[home_team_id], back_populates="games_home")
-    away_team = relationship("Team", foreign_keys=[away_team_id], back_populates="games_away")
+    home_team = relationship("Team", foreign_keys=[home_team_id], lazy='raise')
+    away_team = relationship("Team", foreign_keys=[away_team_id], lazy='raise')
     
     __table_args__ = (
         Index('idx_game_date_teams', 'game_date', 'home_team_id', 'away_team_id'),
+        Index('idx_game_state_date', 'game_state', 'game_date'),
+        # Only the handful of games in progress, so live lookups read one page
+        Index('idx_game_live_now', 'game_date',
+              postgresql_where=game_state == 'LIVE', sqlite_where=game_state == 'LIVE'),
     )
 
 
 class PlayerStats(Base):
-    """Player statistics by season."""
+    """Player statistics by season, one row per club the player played for."""
     __tablename__ = 'player_stats'
     
     id = Column(Integer, primary_key=True)
     player_id = Column(Integer, ForeignKey('players.id'), nullable=False)
-    season = Column(String(10), nullable=False)  # e.g., "20232024"
-    team_id = Column(Integer, ForeignKey('teams.id'))
+    season = Column(Integer, nullable=False)  # NHL season id, e.g. 20232024
+    team_id = Column(Integer, ForeignKey('teams.id'), nullable=False)
     games_played = Column(Integer, default=0)
     
     # Skater stats
@@ -128,15 +144,20 @@ class PlayerStats(Base):
     goals_against_average = Column(Float)
     shutouts = Column(Integer, default=0)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(DateTime, default=func.now(), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    player = relationship("Player", back_populates="player_stats")
+    player = relationship("Player", back_populates="player_stats", lazy='raise')
     
     __table_args__ = (
-        UniqueConstraint('player_id', 'season', name='uq_player_season'),
+        # Traded players get a row per club; season totals are summed at query time
+        UniqueConstraint('player_id', 'season', 'team_id', name='uq_player_season_team'),
         Index('idx_player_season', 'player_id', 'season'),
+        # Season leaderboards (top scorers, goal leaders, goalie wins)
+        Index('idx_playerstats_season_points', 'season', points.desc()),
+        Index('idx_playerstats_season_goals', 'season', goals.desc()),
+        Index('idx_playerstats_season_wins', 'season', wins.desc()),
     )
 
 
@@ -146,7 +167,7 @@ class TeamStats(Base):
     
     id = Column(Integer, primary_key=True)
     team_id = Column(Integer, ForeignKey('teams.id'), nullable=False)
-    season = Column(String(10), nullable=False)
+    season = Column(Integer, nullable=False)  # NHL season id, e.g. 20232024
     games_played = Column(Integer, default=0)
     wins = Column(Integer, default=0)
     losses = Column(Integer, default=0)
@@ -161,15 +182,16 @@ class TeamStats(Base):
     power_play_percentage = Column(Float)
     penalty_kill_percentage = Column(Float)
     faceoff_win_percentage = Column(Float)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(DateTime, default=func.now(), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    team = relationship("Team", back_populates="team_stats")
+    team = relationship("Team", back_populates="team_stats", lazy='selectin')
     
     __table_args__ = (
         UniqueConstraint('team_id', 'season', name='uq_team_season'),
         Index('idx_team_season', 'team_id', 'season'),
+        Index('idx_teamstats_season_points', 'season', 'points'),
     )
 
 
@@ -179,7 +201,8 @@ class DataFetchLog(Base):
     
     id = Column(Integer, primary_key=True)
     fetch_type = Column(String(50), nullable=False)  # teams, players, games, stats
-    fetch_date = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    fetch_date = Column(DateTime, default=func.now(), server_default=func.now(),
+                        nullable=False, index=True)
     status = Column(String(20), nullable=False)  # success, error, partial
     records_fetched = Column(Integer, default=0)
     error_message = Column(String(500))
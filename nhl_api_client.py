@@ -1,13 +1,50 @@
 """NHL API client for fetching stats data."""
+import re
+import orjson
+from functools import lru_cache
 import requests
 import logging
-from datetime import datetime, date
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
+from urllib3.util.retry import Retry
+from datetime import date
 from typing import Dict, List, Optional
 
 from config import config
 
 logger = logging.getLogger(__name__)
 
+# Per-endpoint freshness for cached responses, in seconds. Rosters are kept
+# under the daily update interval so scheduled runs still see roster moves.
+CACHE_EXPIRE_AFTER = {
+    '*/roster/*': 43200,
+    '*/standings/now': 600,
+    '*/club-stats/*': 1800,
+}
+
+# Numeric team ID embedded in some logo URLs (e.g. '.../10.svg')
+_TEAM_ID_RE = re.compile(r'/(\d+)\.')
+
+# Official NHL team IDs of the franchises playing today, used when the standings
+# payload doesn't carry one. Only current teams belong here: standings/now never
+# lists former clubs, and the team list fallback filters on these IDs. Arizona
+# (ARI, 53) is left out since the franchise moved to Utah (UTA) in 2024.
+TEAM_ABBREV_TO_ID = {
+    'NJD': 1, 'NYI': 2, 'NYR': 3, 'PHI': 4, 'PIT': 5, 'BOS': 6, 'BUF': 7,
+    'MTL': 8, 'OTT': 9, 'TOR': 10, 'CAR': 12, 'FLA': 13, 'TBL': 14, 'WSH': 15,
+    'CHI': 16, 'DET': 17, 'NSH': 18, 'STL': 19, 'CGY': 20, 'COL': 21, 'EDM': 22,
+    'VAN': 23, 'ANA': 24, 'DAL': 25, 'LAK': 26, 'SJS': 28, 'CBJ': 29, 'MIN': 30,
+    'WPG': 52, 'VGK': 54, 'SEA': 55, 'UTA': 68,
+}
+
+
+def pick_default(value):
+    """Return the 'default' locale of a localized API field.
+    
+    Plain values pass through unchanged and a missing field gives None.
+    """
+    return value.get('default') if isinstance(value, dict) else value
+
 
 class NHLAPIClient:
     """Client for interacting with NHL public API."""
@@ -17,31 +54,74 @@ class NHLAPIClient:
         self.base_url = config.NHL_API_BASE_URL
         self.stats_url = config.NHL_STATS_API_BASE_URL
         self.legacy_url = config.NHL_LEGACY_API_BASE_URL
-        self.session = requests.Session()
+        # Disk-backed response cache: repeated GETs within an endpoint's
+        # freshness window are served locally without a network round-trip
+        self.session = CachedSession(
+            config.HTTP_CACHE_PATH,
+            backend='sqlite',
+            cache_control=True,
+            expire_after=3600,
+            urls_expire_after=CACHE_EXPIRE_AFTER
+        )
         self.session.headers.update({
-            'User-Agent': 'NHL-Stats-Tracker/1.0'
+            'User-Agent': 'NHL-Stats-Tracker/1.0',
+            'Accept': 'application/json'
         })
+        
+        # Size the connection pool for concurrent fetches and back off
+        # exponentially (honouring Retry-After) when the API rate limits us
+        # or fails with a transient server error
+        retries = Retry(total=3, backoff_factor=0.3,
+                        status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_maxsize=config.FETCH_WORKERS, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def _make_request(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
         """Make HTTP request to NHL API."""
         try:
             response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
-            return response.json()
+            # orjson parses the raw body several times faster than Response.json()
+            return orjson.loads(response.content)
         except requests.exceptions.RequestException as e:
             logger.error(f"API request failed for {url}: {e}")
             return None
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid JSON response from {url}: {e}")
+            return None
+    
+    def get_current_season(self) -> int:
+        """Get current NHL season id (e.g., 20232024)."""
+        return self._compute_season(date.today())
     
-    def get_current_season(self) -> str:
-        """Get current NHL season string (e.g., '20232024')."""
-        today = date.today()
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _compute_season(today: date) -> int:
+        """Season id for a given date: the start and end years run together."""
+        # Keyed on the date rather than cached per client, so a long-running
+        # scheduler still rolls over when a new season starts
         # NHL season typically starts in October
-        if today.month >= 10:
-            return f"{today.year}{today.year + 1}"
-        else:
-            return f"{today.year - 1}{today.year}"
+        start_year = today.year if today.month >= 10 else today.year - 1
+        return start_year * 10000 + start_year + 1
+    
+    def get_teams(self, source: str = 'standings') -> Optional[List[Dict]]:
+        """Fetch all NHL teams.
+        
+        ``source='standings'`` reads the current standings and falls back to the
+        stats API team list if they are unavailable; ``source='teams_endpoint'``
+        uses the team list directly.
+        """
+        if source == 'teams_endpoint':
+            return self._get_teams_from_endpoint()
+        
+        teams = self._get_teams_from_standings()
+        if teams is None:
+            logger.warning("Standings unavailable, falling back to team list endpoint")
+            teams = self._get_teams_from_endpoint()
+        return teams
     
-    def get_teams(self) -> Optional[List[Dict]]:
+    def _get_teams_from_standings(self) -> Optional[List[Dict]]:
         """Fetch all NHL teams from current standings."""
         logger.info("Fetching NHL teams from standings...")
         url = f"{self.base_url}/standings/now"
@@ -53,26 +133,25 @@ class NHLAPIClient:
             seen_abbrevs = set()
 
             for standing in data['standings']:
-                # Extract team abbreviation (e.g., 'TOR', 'BOS')
-                team_abbrev = standing.get('teamAbbrev', {}).get('default') if isinstance(standing.get('teamAbbrev'), dict) else standing.get('teamAbbrev')
-
-                # Extract team name components
-                team_name_data = standing.get('teamName', {})
-                team_common_name = standing.get('teamCommonName', {})
-                place_name = standing.get('placeName', {})
-
-                # Handle both dict and string formats
-                team_name = team_name_data.get('default') if isinstance(team_name_data, dict) else team_name_data
-                common_name = team_common_name.get('default') if isinstance(team_common_name, dict) else team_common_name
-                city = place_name.get('default') if isinstance(place_name, dict) else place_name
+                get = standing.get
+                # Localized fields may be {'default': ...} dicts or plain strings
+                team_abbrev = pick_default(get('teamAbbrev'))  # e.g., 'TOR', 'BOS'
+                team_name = pick_default(get('teamName'))
+                common_name = pick_default(get('teamCommonName'))
+                city = pick_default(get('placeName'))
 
-                # Get team ID or use abbreviation as fallback
-                team_id = standing.get('teamLogo')  # Logo URL often contains team ID
-                if isinstance(team_id, str) and '/' in team_id:
-                    # Extract numeric ID from logo URL if possible
-                    import re
-                    match = re.search(r'/(\d+)\.', team_id)
-                    team_id = int(match.group(1)) if match else hash(team_abbrev) % 100
+                # Get team ID from the logo URL if present, else the known ID table
+                team_id = None
+                team_logo = get('teamLogo')  # Logo URL often contains team ID
+                if isinstance(team_logo, str):
+                    match = _TEAM_ID_RE.search(team_logo)
+                    if match:
+                        team_id = int(match.group(1))
+                if team_id is None:
+                    team_id = TEAM_ABBREV_TO_ID.get(team_abbrev)
+                    if team_id is None:
+                        logger.warning(f"Skipping team {team_abbrev}: unknown team ID")
+                        continue
 
                 # Create a team object compatible with our data model
                 team_obj = {
@@ -91,7 +170,30 @@ class NHLAPIClient:
             return teams
         return None
     
-    def get_team_roster(self, team_abbr: str, season: Optional[str] = None) -> Optional[Dict]:
+    def _get_teams_from_endpoint(self) -> Optional[List[Dict]]:
+        """Fetch NHL teams from the stats API team list."""
+        logger.info("Fetching NHL teams from team list endpoint...")
+        url = f"{self.stats_url}/team"
+        data = self._make_request(url)
+        
+        if data and 'data' in data:
+            # The list includes former franchises; keep only current teams
+            current_ids = set(TEAM_ABBREV_TO_ID.values())
+            teams = [
+                {
+                    'id': team['id'],
+                    'name': team.get('fullName', ''),
+                    'abbreviation': team.get('triCode', ''),
+                    'city': None,
+                    'active': True
+                }
+                for team in data['data'] if team.get('id') in current_ids
+            ]
+            logger.info(f"Successfully fetched {len(teams)} teams from team list")
+            return teams
+        return None
+    
+    def get_team_roster(self, team_abbr: str, season: Optional[int] = None) -> Optional[Dict]:
         """Fetch team roster for a specific season."""
         if not season:
             season = self.get_current_season()
@@ -105,7 +207,7 @@ class NHLAPIClient:
             return data
         return None
     
-    def get_player_stats(self, player_id: int, season: Optional[str] = None) -> Optional[Dict]:
+    def get_player_stats(self, player_id: int, season: Optional[int] = None) -> Optional[Dict]:
         """Fetch player statistics for a specific season."""
         if not season:
             season = self.get_current_season()
@@ -119,7 +221,7 @@ class NHLAPIClient:
             return data
         return None
     
-    def get_team_stats(self, team_abbr: str, season: Optional[str] = None) -> Optional[Dict]:
+    def get_team_stats(self, team_abbr: str, season: Optional[int] = None) -> Optional[Dict]:
         """Fetch team statistics for a specific season."""
         if not season:
             season = self.get_current_season()
@@ -133,7 +235,7 @@ class NHLAPIClient:
             return data
         return None
     
-    def get_standings(self, season: Optional[str] = None) -> Optional[Dict]:
+    def get_standings(self, season: Optional[int] = None) -> Optional[Dict]:
         """Fetch current standings."""
         if not season:
             season = self.get_current_season()
@@ -160,7 +262,7 @@ class NHLAPIClient:
         else:
             # League-wide schedule for a date
             if not start_date:
-                start_date = datetime.now().strftime('%Y-%m-%d')
+                start_date = date.today().isoformat()
             url = f"{self.base_url}/schedule/{start_date}"
         
         data = self._make_request(url)
@@ -181,7 +283,7 @@ class NHLAPIClient:
             return data
         return None
     
-    def get_skater_stats_leaders(self, season: Optional[str] = None, 
+    def get_skater_stats_leaders(self, season: Optional[int] = None, 
                                   stat_type: str = 'points',
                                   limit: int = 100) -> Optional[List[Dict]]:
         """Fetch top skater statistics."""
@@ -204,7 +306,7 @@ class NHLAPIClient:
             return data['data']
         return None
     
-    def get_goalie_stats_leaders(self, season: Optional[str] = None,
+    def get_goalie_stats_leaders(self, season: Optional[int] = None,
                                   limit: int = 50) -> Optional[List[Dict]]:
         """Fetch top goalie statistics."""
         if not season:
@@ -226,6 +328,11 @@ class NHLAPIClient:
             return data['data']
         return None
     
+    def clear_cache(self):
+        """Drop all cached API responses so the next requests hit the network."""
+        logger.info("Clearing cached API responses...")
+        self.session.cache.clear()
+    
     def close(self):
         """Close the session."""
         self.session.close()
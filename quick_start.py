@@ -43,17 +43,20 @@ def main():
         print(f"Step 3: Fetching rosters and stats for {len(teams_to_fetch)} teams...")
         print(f"Teams: {', '.join(teams_to_fetch)}\n")
         
+        # Rosters and stats for all teams are fetched concurrently
+        results = data_manager.fetch_and_store_teams_data(teams_to_fetch)
+        
         for team_abbr in teams_to_fetch:
             print(f"Processing {team_abbr}...")
             
-            # Fetch roster
-            if data_manager.fetch_and_store_team_roster(team_abbr):
+            # Roster
+            if results[team_abbr]['roster']:
                 print(f"  ✓ Roster fetched")
             else:
                 print(f"  ✗ Roster failed")
             
-            # Fetch stats
-            if data_manager.fetch_and_store_team_stats(team_abbr):
+            # Stats
+            if results[team_abbr]['stats']:
                 print(f"  ✓ Stats fetched")
             else:
                 print(f"  ✗ Stats failed")
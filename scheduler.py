@@ -1,6 +1,6 @@
 """Scheduler for periodic NHL stats updates."""
 import schedule
-import time
+import threading
 import logging
 from datetime import datetime
 
@@ -18,15 +18,21 @@ class StatsScheduler:
         """Initialize scheduler."""
         self.data_manager = DataManager()
         self.running = False
+        # Set by stop() to wake the run loop without waiting for the next job
+        self._stop_event = threading.Event()
     
-    def update_all_stats(self):
-        """Update all NHL stats."""
+    def update_all_stats(self, force_refresh: bool = False):
+        """Update all NHL stats, bypassing cached API responses if force_refresh is set."""
         logger.info("=" * 60)
         logger.info(f"Starting scheduled stats update at {datetime.now()}")
         logger.info("=" * 60)
         
         try:
-            self.data_manager.fetch_all_teams_data()
+            api_client = self.data_manager.api_client
+            if force_refresh:
+                api_client.clear_cache()
+            # Resolve the season once and pass it down to every per-team fetch
+            self.data_manager.fetch_all_teams_data(api_client.get_current_season())
             logger.info("Scheduled stats update completed successfully")
         except Exception as e:
             logger.error(f"Error during scheduled update: {e}")
@@ -40,22 +46,29 @@ class StatsScheduler:
         logger.info(f"Scheduler configured to run daily at {update_time}")
         logger.info(f"Update interval: {config.UPDATE_INTERVAL_HOURS} hours")
     
-    def run(self):
-        """Run the scheduler."""
+    def run(self, force_refresh: bool = False):
+        """Run the scheduler, optionally bypassing cached API responses on the initial update."""
         self.running = True
+        self._stop_event.clear()
         self.setup_schedule()
         
         logger.info("Scheduler started. Press Ctrl+C to stop.")
         
         # Run initial update
         logger.info("Running initial stats update...")
-        self.update_all_stats()
+        self.update_all_stats(force_refresh)
         
         # Keep running scheduled tasks
         try:
             while self.running:
+                # Sleep until the next job is due; stop() ends the wait early
+                idle_seconds = schedule.idle_seconds()
+                if idle_seconds is None:
+                    logger.warning("No scheduled jobs left, stopping scheduler")
+                    break
+                if idle_seconds > 0 and self._stop_event.wait(idle_seconds):
+                    break
                 schedule.run_pending()
-                time.sleep(60)  # Check every minute
         except KeyboardInterrupt:
             logger.info("Scheduler stopped by user")
             self.stop()
@@ -63,11 +76,13 @@ class StatsScheduler:
     def stop(self):
         """Stop the scheduler."""
         self.running = False
+        self._stop_event.set()
+        schedule.clear()
         self.data_manager.close()
         logger.info("Scheduler stopped")
 
 
-def main():
+def main(force_refresh: bool = False):
     """Main entry point for scheduler."""
     # Setup logging
     logging.basicConfig(
@@ -89,7 +104,7 @@ def main():
     
     # Start scheduler
     scheduler = StatsScheduler()
-    scheduler.run()
+    scheduler.run(force_refresh)
 
 
 if __name__ == '__main__':